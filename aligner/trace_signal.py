@@ -16,198 +16,504 @@ import re
 import sys
 import os
 import argparse
+import atexit
+import functools
+import hashlib
+import json
+import mmap
+import multiprocessing
+import shutil
+import string
 import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _cache_home():
+    """Return $XDG_CACHE_HOME, or ~/.cache if it is unset, empty or relative (per the XDG spec)."""
+    xdg_cache = os.environ.get('XDG_CACHE_HOME')
+    if xdg_cache and os.path.isabs(xdg_cache):
+        return Path(xdg_cache)
+    return Path.home() / '.cache'
+
+
+CACHE_DIR = _cache_home() / 'chisel_sfv'
+
+_MODULE_RE = re.compile(rb'^[ \t]*module[ \t]+(\w+)', re.MULTILINE)
+
+
+def _map_file(path):
+    """Map a file read-only into memory (empty files map to b'')."""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b''
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+@functools.lru_cache(maxsize=8)
+def _scan_modules(path, mtime_ns):
+    """List all module names in a Verilog file, in order, in one pass.
+
+    mtime_ns is only part of the cache key, so edited files are rescanned.
+    """
+    return [m.group(1).decode() for m in _MODULE_RE.finditer(_map_file(path))]
+
+
+def _modules_in(verilog_file):
+    """Return the cached module list for a Verilog file."""
+    return _scan_modules(verilog_file, os.stat(verilog_file).st_mtime_ns)
+
 
 def detect_module_name(verilog_file):
     """Auto-detect the first module name from a Verilog file."""
-    with open(verilog_file, 'r') as f:
-        for line in f:
-            match = re.match(r'\s*module\s+(\w+)', line)
-            if match:
-                return match.group(1)
-    return None
+    modules = _modules_in(verilog_file)
+    return modules[0] if modules else None
 
 
 def get_other_modules(verilog_file, target_module):
     """Find all module names in a Verilog file except the target module."""
-    modules = []
-    with open(verilog_file, 'r') as f:
-        for line in f:
-            match = re.match(r'\s*module\s+(\w+)', line)
-            if match and match.group(1) != target_module:
-                modules.append(match.group(1))
-    return modules
+    return [m for m in _modules_in(verilog_file) if m != target_module]
+
+
+_DECL_KEYWORD_RE = re.compile(rb'\b(?:wire|reg)\b')
 
 
-def get_source_location(signal_name, verilog_file):
+def get_source_location(signal_name, verilog_file, line_hint=None):
     """Extract source location annotation for a signal from Verilog comments.
 
     Handles two annotation formats:
       - @[src/main/scala/Fifo.scala:46:20]     (CIRCT wrapInAtSquareBracket)
       - // src/main/scala/Fifo.scala:46:20      (CIRCT plain comment)
+
+    If line_hint (the declaration line from the signal's Yosys \\src attribute)
+    is given, that line is checked first before falling back to a full scan.
     """
-    with open(verilog_file, 'r') as f:
+    hints = {signal_name: line_hint} if line_hint else None
+    return get_source_locations([signal_name], verilog_file, hints).get(signal_name)
+
+
+def get_source_locations(signal_names, verilog_file, line_hints=None, module_name=None):
+    """Batch form of get_source_location. Returns {signal_name: location} for signals found.
+
+    Signals with a line hint are checked on that line first; all others are
+    resolved together in a single scan of the file. If module_name is given,
+    the scan only covers that module's body and stops at its endmodule.
+    """
+    locations = {}
+    for name, line_num in (line_hints or {}).items():
+        line = _line_bytes(verilog_file, line_num) if line_num else None
+        if line and _declares_signal(line, name):
+            loc = _extract_location(line)
+            if loc:
+                locations[name] = loc
+
+    remaining = set(signal_names) - set(locations)
+    if not remaining:
+        return locations
+
+    # Scan raw bytes (Verilog identifiers are ASCII) so no line is decoded
+    # unless it turns out to carry a wanted location
+    pending = {n.encode(): n for n in remaining}
+    names_alt = b'|'.join(re.escape(n) for n in sorted(pending, key=len, reverse=True))
+    name_re = re.compile(rb'\b(' + names_alt + rb')\b')
+    assign_re = re.compile(rb'\bassign\b\s+(' + names_alt + rb')\b')
+
+    # A 1 MiB buffer keeps read() syscalls down on large generated files
+    target = module_name.encode() if module_name else None
+    in_module = target is None
+    with open(verilog_file, 'rb', buffering=1 << 20) as f:
         for line in f:
-            if re.search(rf'\b(wire|reg)\b.*\b{re.escape(signal_name)}\b', line) and '//' in line:
-                loc = _extract_location(line)
-                if loc:
-                    return loc
-            if re.search(rf'\bassign\b\s+{re.escape(signal_name)}\b', line) and '//' in line:
-                loc = _extract_location(line)
-                if loc:
-                    return loc
-    return None
+            if not in_module:
+                if b'module' in line:
+                    header = _MODULE_RE.match(line)
+                    in_module = header is not None and header.group(1) == target
+                continue
+            if target and line.lstrip().startswith(b'endmodule'):
+                break
+            if b'//' not in line:
+                continue
+            # Lines without any of the keywords cannot declare or assign a name
+            if b'wire' not in line and b'reg' not in line and b'assign' not in line:
+                continue
+            # Same rules as _declares_signal: any name after wire/reg, or the assign target
+            found = set()
+            decl = _DECL_KEYWORD_RE.search(line)
+            if decl:
+                found.update(name_re.findall(line, decl.end()))
+            if b'assign' in line:
+                found.update(assign_re.findall(line))
+            found &= pending.keys()
+            if not found:
+                continue
+            loc = _extract_location(line)
+            if loc:
+                for name in found:
+                    locations[pending.pop(name)] = loc
+                if not pending:
+                    break
+    return locations
+
+
+def _declares_signal(line, signal_name):
+    """Check whether a commented Verilog line (bytes) declares or assigns signal_name."""
+    # Plain substring screens are far cheaper than building and running the regexes
+    if b'//' not in line or signal_name.encode() not in line:
+        return False
+    # Search for the name from the end of the first wire/reg keyword rather than
+    # with a '.*' bridge, so no backtracking is needed on long lines
+    name_re, assign_re = _signal_patterns(signal_name)
+    decl = _DECL_KEYWORD_RE.search(line)
+    if decl and name_re.search(line, decl.end()):
+        return True
+    return bool(assign_re.search(line))
+
+
+@functools.lru_cache(maxsize=1024)
+def _signal_patterns(signal_name):
+    """Compile the bytes word and assign-target patterns for signal_name once."""
+    name = re.escape(signal_name.encode())
+    return re.compile(rb'\b' + name + rb'\b'), re.compile(rb'\bassign\b\s+' + name + rb'\b')
+
+
+_AT_LOC_RE = re.compile(rb'@\[([^\]]+)\]')
+_PLAIN_LOC_RE = re.compile(rb'//\s*(.+\.scala:\d+.*)$')
 
 
 def _extract_location(line):
-    """Extract source location from a Verilog comment line.
+    """Extract source location from a Verilog comment line (bytes) as a str.
 
     Supports:
       // @[src/main/scala/Fifo.scala:46:20]
       // src/main/scala/Fifo.scala:46:20
     """
     # Try @[...] format first
-    match = re.search(r'@\[([^\]]+)\]', line)
+    match = _AT_LOC_RE.search(line)
     if match:
-        return match.group(1)
+        return match.group(1).decode('utf-8', errors='replace')
     # Try plain comment format: // <path>:<line>:<col>
-    match = re.search(r'//\s*(.+\.scala:\d+.*)$', line)
+    match = _PLAIN_LOC_RE.search(line)
     if match:
-        return match.group(1).strip()
+        return match.group(1).strip().decode('utf-8', errors='replace')
     return None
 
 
+@functools.lru_cache(maxsize=4)
+def _line_index(path, mtime_ns):
+    """Map a file into memory and index its line start offsets.
+
+    Returns (data, offsets) where line N (1-indexed) is data[offsets[N-1]:offsets[N]].
+    mtime_ns is only part of the cache key, so edited files are re-indexed.
+    """
+    data = _map_file(path)
+    offsets = [0]
+    pos = data.find(b'\n')
+    while pos != -1:
+        offsets.append(pos + 1)
+        pos = data.find(b'\n', pos + 1)
+    if offsets[-1] != len(data):
+        offsets.append(len(data))
+    return data, offsets
+
+
+def _line_bytes(path, line_num):
+    """Return line line_num (1-indexed) of a file as bytes, or None if out of range."""
+    data, offsets = _line_index(path, os.stat(path).st_mtime_ns)
+    if not 1 <= line_num < len(offsets):
+        return None
+    return data[offsets[line_num - 1]:offsets[line_num]]
+
+
+def _read_line(path, line_num):
+    """Return line line_num (1-indexed) of a file, or None if out of range."""
+    line = _line_bytes(path, line_num)
+    return None if line is None else line.decode('utf-8', errors='replace')
+
+
 def get_expression_text(verilog_file, line_num, start_col, end_col):
     """Extract the expression text from a Verilog file at the given location."""
-    with open(verilog_file, 'r') as f:
-        for i, line in enumerate(f, 1):
-            if i == line_num:
-                # Columns are 1-indexed in Yosys src attributes
-                return line[start_col - 1:end_col].rstrip()
-    return None
+    line = _read_line(verilog_file, line_num)
+    if line is None:
+        return None
+    # Columns are 1-indexed in Yosys src attributes
+    return line[start_col - 1:end_col].rstrip()
+
+
+def _src_line(src, verilog_file):
+    """Return the first line number a Yosys \\src attribute gives for verilog_file."""
+    if not src:
+        return None
+    match = _src_line_re(verilog_file).search(src)
+    return int(match.group(1)) if match else None
+
+
+@functools.lru_cache(maxsize=8)
+def _src_line_re(verilog_file):
+    """Compile the \\src line-number pattern for verilog_file once per file."""
+    return re.compile(rf'{re.escape(os.path.abspath(verilog_file))}:(\d+)\.')
+
+
+_LOC_ARG_RE = re.compile(r'(\d+)\.(\d+)-(\d+)$')
 
 
 def parse_loc(loc_str):
     """Parse location string like '21.23-39' into (line, start_col, end_col)."""
-    match = re.match(r'(\d+)\.(\d+)-(\d+)$', loc_str)
+    match = _LOC_ARG_RE.match(loc_str)
     if not match:
         return None
     return int(match.group(1)), int(match.group(2)), int(match.group(3))
 
 
-def generate_miter_script(gold_file, gate_file, module_name):
-    """Generate the Yosys miter setup commands."""
-    gold_others = get_other_modules(gold_file, module_name)
-    gate_others = get_other_modules(gate_file, module_name)
-
-    gold_abs = os.path.abspath(gold_file)
-    gate_abs = os.path.abspath(gate_file)
-
-    gold_delete = '\n'.join(f'delete {m}' for m in gold_others)
-    gate_delete = '\n'.join(f'delete {m}' for m in gate_others)
-
-    return f"""read_verilog -formal {gold_abs}
-{gold_delete}
-prep -flatten -top {module_name}
+_MITER_SCRIPT = string.Template("""read_verilog -formal $gold_file
+$gold_delete
+prep -flatten -top $module
 rename -top gold
 clk2fflogic
 design -stash gold
 
-read_verilog -formal {gate_abs}
-{gate_delete}
-prep -flatten -top {module_name}
+read_verilog -formal $gate_file
+$gate_delete
+prep -flatten -top $module
 rename -top gate
 clk2fflogic
 
 design -copy-from gold -as gold gold
 miter -equiv -flatten -make_outputs gold gate miter
 hierarchy -top miter
-"""
+""")
 
 
-def run_yosys_dump(gold_file, gate_file, module_name):
-    """Run Yosys to create miter and dump RTLIL. Returns dump text."""
-    script = generate_miter_script(gold_file, gate_file, module_name)
-    script += "dump miter\n"
+def generate_miter_script(gold_file, gate_file, module_name):
+    """Generate the Yosys miter setup commands."""
+    gold_others = get_other_modules(gold_file, module_name)
+    gate_others = get_other_modules(gate_file, module_name)
+
+    return _MITER_SCRIPT.substitute(
+        gold_file=os.path.abspath(gold_file),
+        gate_file=os.path.abspath(gate_file),
+        gold_delete='\n'.join(f'delete {m}' for m in gold_others),
+        gate_delete='\n'.join(f'delete {m}' for m in gate_others),
+        module=module_name,
+    )
+
+
+def _design_key(gold_file, gate_file, module_name):
+    """Hash the miter script, gold/gate contents and Yosys binary into a cache key.
+
+    The script carries the absolute paths, which Yosys embeds in every \\src
+    attribute, and the module name, so editing it invalidates old entries too.
+    """
+    h = hashlib.sha256()
+    h.update(generate_miter_script(gold_file, gate_file, module_name).encode())
+    for path in (gold_file, gate_file):
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                h.update(chunk)
+    # A Yosys upgrade may build a different miter; the binary's identity stands in for its version
+    yosys = shutil.which('yosys')
+    if yosys:
+        st = os.stat(yosys)
+        h.update(f'{os.path.realpath(yosys)}:{st.st_size}:{st.st_mtime_ns}'.encode())
+    return h.hexdigest()
+
+
+def _cache_writable():
+    """Create CACHE_DIR if needed and check that new files can be written to it."""
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    except OSError as e:
+        reason = str(e)
+    else:
+        if os.access(CACHE_DIR, os.W_OK | os.X_OK):
+            return True
+        reason = 'not writable'
+    print(f"  Warning: cannot write to cache directory {CACHE_DIR} ({reason}); continuing without it")
+    return False
+
+
+def _scratch_base():
+    """Return a miter path base in a scratch directory removed when the process exits."""
+    work_dir = tempfile.mkdtemp(prefix='chisel_sfv_')
+    atexit.register(shutil.rmtree, work_dir, ignore_errors=True)
+    return Path(work_dir) / 'miter'
+
 
+def _run_yosys_script(script, timeout):
+    """Run a Yosys script from a temp file. Returns the CompletedProcess."""
     with tempfile.NamedTemporaryFile(mode='w', suffix='.ys', delete=False) as f:
         f.write(script)
         script_path = f.name
 
     try:
-        result = subprocess.run(
+        return subprocess.run(
             ['yosys', '-Q', '-s', script_path],
-            capture_output=True, text=True, timeout=120
+            capture_output=True, text=True, timeout=timeout
         )
-        return result.stdout
     finally:
         os.unlink(script_path)
 
 
-def parse_dump(dump_text, gate_file, gold_file):
-    """Parse RTLIL dump to extract wire info.
+def _load_json(path):
+    """Load a JSON file, using orjson when it is installed."""
+    if orjson:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def run_yosys_json(gold_file, gate_file, module_name, use_cache=True):
+    """Run Yosys to create the miter, writing it with write_json and write_rtlil.
+
+    Returns (netlist, rtlil_path), or (None, error) if Yosys failed, where error
+    is its ERROR: lines, or the tail of its log if it printed none. The RTLIL
+    lets the proof step load the miter instead of rebuilding it. With
+    use_cache both files are kept in CACHE_DIR under the design key and reused
+    without running Yosys. If they are missing and CACHE_DIR is not writable,
+    the miter is built in a scratch directory instead.
+    """
+    base = None
+    if use_cache:
+        base = CACHE_DIR / _design_key(gold_file, gate_file, module_name)
+        json_path, rtlil_path = base.with_suffix('.json'), base.with_suffix('.il')
+        if json_path.exists() and rtlil_path.exists():
+            return _load_json(json_path), rtlil_path
+        if not _cache_writable():
+            base = None
+    if base is None:
+        base = _scratch_base()
+    json_path, rtlil_path = base.with_suffix('.json'), base.with_suffix('.il')
+
+    # Yosys writes per-process partial files, published only once it has exited
+    # cleanly, so concurrent runs never see or remove each other's output
+    partial_rtlil = rtlil_path.with_name(f'{rtlil_path.name}.{os.getpid()}.partial')
+    partial_json = json_path.with_name(f'{json_path.name}.{os.getpid()}.partial')
+    script = generate_miter_script(gold_file, gate_file, module_name)
+    script += f"write_rtlil {partial_rtlil}\n"
+    script += f"write_json -compat-int {partial_json}\n"
+    try:
+        try:
+            result = _run_yosys_script(script, timeout=120)
+        except subprocess.TimeoutExpired:
+            return None, "Yosys did not finish within 120s"
+        if result.returncode != 0:
+            log = (result.stdout + result.stderr).splitlines()
+            errors = [line for line in log if line.startswith('ERROR:')]
+            return None, '\n'.join(errors or log[-20:])
+        # The JSON goes last: a cache hit needs both files
+        os.replace(partial_rtlil, rtlil_path)
+        os.replace(partial_json, json_path)
+        return _load_json(json_path), rtlil_path
+    finally:
+        for partial_path in (partial_rtlil, partial_json):
+            if partial_path.exists():
+                os.unlink(partial_path)
+
+
+def _verdicts_path(rtlil_path):
+    """Return the proof-verdict cache file that sits beside a cached miter."""
+    return rtlil_path.with_name(rtlil_path.stem + '.proofs.json')
+
+
+def _verdict_key(gate_target_wire, bounded):
+    """Key verdicts by the sat command they came from, so editing it drops old verdicts."""
+    sat_cmd = _SAT_BOUNDED if bounded else _SAT_INDUCT
+    return sat_cmd.format(wire='*', target=gate_target_wire).strip()
+
+
+def _read_verdict_cache(path):
+    """Load the verdict cache at path, treating a missing or malformed file as empty."""
+    try:
+        cache = _load_json(path)
+    except (OSError, ValueError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+
+def _load_verdicts(path, gate_target_wire, bounded):
+    """Return cached {gold_wire: passed} verdicts for gate_target_wire, or {}."""
+    verdicts = _read_verdict_cache(path).get(_verdict_key(gate_target_wire, bounded))
+    return verdicts if isinstance(verdicts, dict) else {}
+
+
+def _save_verdicts(path, gate_target_wire, bounded, verdicts):
+    """Merge {gold_wire: passed} verdicts for gate_target_wire into the cache at path.
+
+    Failing to write only costs the cache, so it is reported and otherwise ignored.
+    """
+    cache = _read_verdict_cache(path)
+    key = _verdict_key(gate_target_wire, bounded)
+    entry = cache.get(key)
+    cache[key] = {**(entry if isinstance(entry, dict) else {}), **verdicts}
+
+    # Write then rename, so concurrent runs never read a half-written file
+    partial_path = path.with_name(f'{path.name}.{os.getpid()}.partial')
+    try:
+        with open(partial_path, 'w') as f:
+            json.dump(cache, f)
+        os.replace(partial_path, path)
+    except OSError as e:
+        print(f"  Warning: cannot save proof verdicts to {path} ({e})")
+        if partial_path.exists():
+            os.unlink(partial_path)
+
+
+def miter_base_script(gold_file, gate_file, module_name, rtlil_path=None):
+    """Return the script prefix that sets up the miter, loading prebuilt RTLIL if available."""
+    if rtlil_path and os.path.exists(rtlil_path):
+        return f"read_rtlil {rtlil_path}\nhierarchy -top miter\n"
+    return generate_miter_script(gold_file, gate_file, module_name)
+
+
+def parse_json(netlist, gate_file, gold_file):
+    """Extract wire info from the miter module of a Yosys write_json netlist.
 
     Returns:
         gate_wires: list of (wire_name, width, src_attr, hdlname)
         gold_wires: list of (wire_name, width, src_attr, hdlname)
+        net_of: dict mapping each wire to one representative wire name with
+                identical bits, i.e. on the same net
     """
     gate_wires = []
     gold_wires = []
+    net_of = {}
+    rep_of_bits = {}
 
     gate_abs = os.path.abspath(gate_file)
     gold_abs = os.path.abspath(gold_file)
 
-    # Parse state machine: collect attributes, then match wire declaration
-    current_src = None
-    current_hdlname = None
-
-    for line in dump_text.split('\n'):
-        line = line.strip()
-
-        # Track attributes
-        src_match = re.match(r'attribute\s+\\src\s+"([^"]+)"', line)
-        if src_match:
-            current_src = src_match.group(1)
-            continue
-
-        hdl_match = re.match(r'attribute\s+\\hdlname\s+"([^"]+)"', line)
-        if hdl_match:
-            current_hdlname = hdl_match.group(1)
-            continue
-
-        # Match wire declarations
-        wire_match = re.match(r'wire\s+(?:width\s+(\d+)\s+)?(?:(?:input|output)\s+\d+\s+)?(.+)', line)
-        if wire_match:
-            width = int(wire_match.group(1)) if wire_match.group(1) else 1
-            wire_name = wire_match.group(2).strip()
-
-            # Classify as gold or gate
-            if current_hdlname and current_hdlname.startswith('gold '):
-                orig_name = current_hdlname[5:]  # strip "gold " prefix
-                gold_wires.append((wire_name, width, current_src, orig_name))
-            elif current_hdlname and current_hdlname.startswith('gate '):
-                orig_name = current_hdlname[5:]  # strip "gate " prefix
-                gate_wires.append((wire_name, width, current_src, orig_name))
-            elif current_src:
-                # No hdlname — check if src points to gold or gate file
-                if gold_abs in (current_src or ''):
-                    gold_wires.append((wire_name, width, current_src, None))
-                elif gate_abs in (current_src or ''):
-                    gate_wires.append((wire_name, width, current_src, None))
-
-            # Reset attributes
-            current_src = None
-            current_hdlname = None
-            continue
-
-        # Non-wire/attribute lines reset attributes
-        if not line.startswith('attribute'):
-            current_src = None
-            current_hdlname = None
-
-    return gate_wires, gold_wires
+    netnames = netlist['modules']['miter']['netnames']
+    for name, net in netnames.items():
+        # JSON drops the leading backslash of public RTLIL names
+        wire_name = name if name.startswith('$') else '\\' + name
+        width = len(net['bits'])
+        attrs = net.get('attributes', {})
+        src = attrs.get('src')
+        hdlname = attrs.get('hdlname')
+
+        net_of[wire_name] = rep_of_bits.setdefault(tuple(net['bits']), wire_name)
+
+        # Classify as gold or gate
+        if hdlname and hdlname.startswith('gold '):
+            orig_name = hdlname[5:]  # strip "gold " prefix
+            gold_wires.append((wire_name, width, src, orig_name))
+        elif hdlname and hdlname.startswith('gate '):
+            orig_name = hdlname[5:]  # strip "gate " prefix
+            gate_wires.append((wire_name, width, src, orig_name))
+        elif src:
+            # No hdlname — check if src points to gold or gate file
+            if gold_abs in src:
+                gold_wires.append((wire_name, width, src, None))
+            elif gate_abs in src:
+                gate_wires.append((wire_name, width, src, None))
+
+    return gate_wires, gold_wires, net_of
 
 
 def find_gate_target(gate_wires, gate_file, line, start_col, end_col):
@@ -225,36 +531,28 @@ def find_gate_target(gate_wires, gate_file, line, start_col, end_col):
     return matches
 
 
-def filter_gold_candidates(gold_wires):
-    """Filter gold wires to meaningful candidates (skip io ports, clock, reset, internals)."""
+# Gold wire names that are never useful candidates, matched in one scan:
+#   miter infrastructure (\in_*, \trigger, \gold_*, \gate_*), clk2fflogic
+#   internals, procmux internals, rtlil internals and $0\ next-state wires
+_WIRE_SKIP_RE = re.compile(r'^\\(?:in_|trigger|gold_|gate_)|clk2fflogic|\$procmux\$|rtlil\.cc|\$0\\')
+_ORIG_SKIP = frozenset({'clock', 'reset'})
+
+
+def filter_gold_candidates(gold_wires, target_width=None):
+    """Filter gold wires to meaningful candidates (skip io ports, clock, reset, internals).
+
+    If target_width is given, wires of any other width are dropped first.
+    """
     candidates = []
     for wire_name, width, src, orig_name in gold_wires:
-        # Skip if no original name and no useful src
-        name = orig_name or wire_name
+        # Cheapest test first: most wires have the wrong width
+        if target_width is not None and width != target_width:
+            continue
 
         # Skip clock, reset, io ports
-        if orig_name:
-            if orig_name in ('clock', 'reset'):
-                continue
-            if orig_name.startswith('io_'):
-                continue
-
-        # Skip clk2fflogic internals
-        if 'clk2fflogic' in wire_name:
-            continue
-        # Skip miter infrastructure
-        if wire_name.startswith('\\in_') or wire_name.startswith('\\trigger'):
-            continue
-        if wire_name.startswith('\\gold_') or wire_name.startswith('\\gate_'):
-            continue
-        # Skip procmux internals
-        if '$procmux$' in wire_name:
+        if orig_name and (orig_name in _ORIG_SKIP or orig_name.startswith('io_')):
             continue
-        # Skip rtlil internals
-        if 'rtlil.cc' in wire_name:
-            continue
-        # Skip $0\ next-state wires
-        if '$0\\' in wire_name:
+        if _WIRE_SKIP_RE.search(wire_name):
             continue
 
         candidates.append((wire_name, width, src, orig_name))
@@ -262,46 +560,207 @@ def filter_gold_candidates(gold_wires):
     return candidates
 
 
-def run_proofs(gold_file, gate_file, module_name, gate_target_wire, candidates, bounded=False):
-    """Generate and run proof script. Returns list of (candidate, passed)."""
-    script = generate_miter_script(gold_file, gate_file, module_name)
+_SAT_RESULT_RE = re.compile(r'\b(SUCCESS|FAIL)!')
 
-    # Add one sat command per candidate
-    for wire_name, width, src, orig_name in candidates:
-        if bounded:
-            script += f"sat -prove {wire_name} {gate_target_wire} -set-init-zero -seq 2\n"
-        else:
-            script += f"sat -tempinduct -prove trigger 0 -prove {wire_name} {gate_target_wire} -set-init-zero -seq 2 miter\n"
+# sat command per candidate; {wire} is the gold candidate, {target} the gate wire
+_SAT_BOUNDED = "sat -prove {wire} {target} -set-init-zero -seq 2\n"
+_SAT_INDUCT = "sat -tempinduct -prove trigger 0 -prove {wire} {target} -set-init-zero -seq 2 miter\n"
+
+
+def _run_sat_batch(base_script, sat_cmds, timeout, stop=None):
+    """Run base_script followed by sat_cmds in one Yosys process.
+
+    Returns (verdicts, outcome, error). verdicts holds SUCCESS/FAIL as booleans
+    for the leading commands that finished. outcome is 'done' when all did,
+    'stopped' if Yosys was killed because the stop event was set, and otherwise
+    'candidate' if Yosys stopped inside the next sat command, or 'setup' if it
+    never reached one. error is the Yosys ERROR: line (or exit status), and
+    None when Yosys was killed after timeout seconds without a verdict.
+    """
+    if stop is not None and stop.is_set():
+        return [], 'stopped', None
 
     with tempfile.NamedTemporaryFile(mode='w', suffix='.ys', delete=False) as f:
-        f.write(script)
+        f.write(base_script + ''.join(sat_cmds))
         script_path = f.name
 
+    proc = watcher = None
+    expired = threading.Event()
+    deadline = time.monotonic() + timeout
+
+    def watchdog():
+        while proc.poll() is None:
+            if stop is not None and stop.is_set():
+                proc.kill()
+                return
+            if time.monotonic() > deadline:
+                expired.set()
+                proc.kill()
+                return
+            time.sleep(0.1)
+
+    # Parse SUCCESS/FAIL results in order as Yosys reports them
+    verdicts = []
+    started = 0
+    error = None
     try:
-        result = subprocess.run(
+        proc = subprocess.Popen(
             ['yosys', '-Q', '-s', script_path],
-            capture_output=True, text=True, timeout=600
+            stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True
         )
-        output = result.stdout + result.stderr
+        watcher = threading.Thread(target=watchdog, daemon=True)
+        watcher.start()
+        for line in proc.stdout:
+            if line.startswith('ERROR:'):
+                error = line.strip()
+                continue
+            if 'SAT pass' in line:
+                started += 1
+                continue
+            # Nearly all lines are solver trace; a plain substring test rejects them cheaply
+            if '!' not in line:
+                continue
+            m = _SAT_RESULT_RE.search(line)
+            if not m:
+                continue
+            verdicts.append(m.group(1) == 'SUCCESS')
+            if len(verdicts) == len(sat_cmds):
+                break
+            deadline = time.monotonic() + timeout
     finally:
+        if proc:
+            if proc.poll() is None:
+                proc.kill()
+            proc.wait()
+            proc.stdout.close()
+            watcher.join()
         os.unlink(script_path)
 
-    # Parse SUCCESS/FAIL results in order
-    results = []
-    result_idx = 0
-    for line in output.split('\n'):
-        if 'SUCCESS!' in line:
-            if result_idx < len(candidates):
-                results.append((candidates[result_idx], True))
-                result_idx += 1
-        elif 'FAIL!' in line:
-            if result_idx < len(candidates):
-                results.append((candidates[result_idx], False))
-                result_idx += 1
+    if len(verdicts) == len(sat_cmds):
+        return verdicts, 'done', None
+    if stop is not None and stop.is_set():
+        return verdicts, 'stopped', None
+    if not expired.is_set() and error is None:
+        error = f"Yosys exited with status {proc.returncode}"
+    return verdicts, 'candidate' if started > len(verdicts) else 'setup', error
+
+
+def _prove_shard(base_script, gate_target_wire, shard, bounded, timeout=600, stop=None):
+    """Prove one shard of (index, candidate) pairs. Returns list of (index, passed, error).
 
+    Each candidate gets its own timeout seconds. passed is None when no verdict
+    was reached; error then holds the Yosys error, or None for a timeout. A
+    candidate that stalls or fails only costs itself: Yosys is restarted on the
+    rest of the shard. A failure before the first sat command (e.g. a bad
+    miter) is reported for every remaining candidate. Once the stop event is
+    set, Yosys is killed and unfinished candidates are left out of the results.
+    """
+    sat_cmd = _SAT_BOUNDED if bounded else _SAT_INDUCT
+
+    results = []
+    remaining = shard
+    while remaining:
+        # Add one sat command per candidate
+        sat_cmds = [sat_cmd.format(wire=wire_name, target=gate_target_wire)
+                    for _, (wire_name, width, src, orig_name) in remaining]
+        verdicts, outcome, error = _run_sat_batch(base_script, sat_cmds, timeout, stop)
+        results += [(idx, passed, None) for (idx, _), passed in zip(remaining, verdicts)]
+        remaining = remaining[len(verdicts):]
+        if outcome == 'candidate':
+            results.append((remaining[0][0], None, error))
+            remaining = remaining[1:]
+        elif outcome == 'setup':
+            results += [(idx, None, error) for idx, _ in remaining]
+            break
+        elif outcome == 'stopped':
+            break
     return results
 
 
+def run_proofs(gold_file, gate_file, module_name, gate_target_wire, candidates, bounded=False, jobs=None,
+               rtlil_path=None, net_of=None, first_match=False, timeout=600):
+    """Generate and run proof scripts. Returns (results, errors).
+
+    results is a list of (candidate, passed); passed is None for candidates
+    left without a verdict. errors maps the wire name of each such candidate
+    whose Yosys run failed to the error; the rest exceeded the per-candidate
+    timeout.
+
+    Candidates on the same net (per net_of from parse_json) are proved once
+    through a representative. Representatives are split round-robin into
+    shards, and each shard is proved by its own Yosys process against an
+    identical miter, loaded from rtlil_path when Step 1 produced one. With
+    first_match, every representative gets its own process; once one passes,
+    pending proofs are cancelled and running ones are killed, and only the
+    candidates that reached a verdict are returned.
+    """
+    if not candidates:
+        return [], {}
+
+    base_script = miter_base_script(gold_file, gate_file, module_name, rtlil_path)
+
+    # Prove one representative per net
+    net_of = net_of or {}
+    rep_of_net = {}
+    for idx, (wire_name, width, src, orig_name) in enumerate(candidates):
+        rep_of_net.setdefault(net_of.get(wire_name, wire_name), idx)
+    indexed = [(idx, candidates[idx]) for idx in rep_of_net.values()]
+
+    jobs = min(len(indexed), jobs or os.cpu_count() or 1)
+    if first_match:
+        shards = [[item] for item in indexed]
+    else:
+        shards = [indexed[i::jobs] for i in range(jobs)]
+
+    passed_by_idx = {}
+    error_by_idx = {}
+    # Pool workers cannot inherit a plain multiprocessing.Event, so share a managed one
+    manager = multiprocessing.Manager() if first_match else None
+    stop = manager.Event() if manager else None
+    try:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = [pool.submit(_prove_shard, base_script, gate_target_wire, shard, bounded,
+                                   timeout, stop)
+                       for shard in shards]
+            for future in as_completed(futures):
+                if future.cancelled():
+                    continue
+                shard_results = future.result()
+                for idx, passed, error in shard_results:
+                    passed_by_idx[idx] = passed
+                    if error:
+                        error_by_idx[idx] = error
+                if stop and not stop.is_set() and any(passed for _, passed, _ in shard_results):
+                    stop.set()
+                    for pending in futures:
+                        pending.cancel()
+    finally:
+        if manager:
+            manager.shutdown()
+
+    # Stitch representative results back onto every candidate, in original order
+    results = []
+    errors = {}
+    for wire_name, width, src, orig_name in candidates:
+        rep_idx = rep_of_net[net_of.get(wire_name, wire_name)]
+        if rep_idx in passed_by_idx:
+            results.append(((wire_name, width, src, orig_name), passed_by_idx[rep_idx]))
+        if rep_idx in error_by_idx:
+            errors[wire_name] = error_by_idx[rep_idx]
+    return results, errors
+
+
+def _positive_int(value):
+    """argparse type for options that need a positive integer."""
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"expected a positive integer, got '{value}'")
+    return number
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='Trace optimized Verilog signals back to Chisel source via formal equivalence',
@@ -324,6 +783,14 @@ Examples:
                         help='Module name to check (auto-detected if not specified)')
     parser.add_argument('--bounded', '-b', action='store_true',
                         help='Use bounded BMC (default: unbounded k-induction)')
+    parser.add_argument('--jobs', '-j', type=_positive_int,
+                        help='Number of parallel Yosys proof processes (default: CPU count)')
+    parser.add_argument('--timeout', '-t', type=_positive_int, default=600,
+                        help='Per-candidate proof time limit in seconds (default: 600)')
+    parser.add_argument('--first-match', action='store_true',
+                        help='Stop proving once one equivalent signal is found')
+    parser.add_argument('--no-cache', action='store_true',
+                        help=f'Do not read or write the miter and proof cache in {CACHE_DIR}')
 
     args = parser.parse_args()
 
@@ -366,13 +833,19 @@ Examples:
         print(f"  Expression:         {expr_text}")
     print(f"  Proof method:       {'bounded BMC (-seq 2)' if args.bounded else 'unbounded k-induction (-tempinduct)'}")
 
-    # Step 1: Run Yosys dump
-    print(f"\n[Step 1] Creating miter circuit and dumping RTLIL...")
-    dump_text = run_yosys_dump(gold_file, gate_file, module_name)
+    # Step 1: Build miter and write JSON netlist
+    print(f"\n[Step 1] Creating miter circuit and writing JSON netlist...")
+    netlist, rtlil_or_error = run_yosys_json(gold_file, gate_file, module_name, use_cache=not args.no_cache)
+    if netlist is None:
+        print("Error: Yosys failed to build the miter circuit:")
+        for line in rtlil_or_error.splitlines():
+            print(f"  {line}")
+        sys.exit(1)
+    rtlil_path = rtlil_or_error
 
-    # Step 2: Parse dump
-    print("[Step 2] Parsing wire names from dump...")
-    gate_wires, gold_wires = parse_dump(dump_text, gate_file, gold_file)
+    # Step 2: Parse netlist
+    print("[Step 2] Parsing wire names from netlist...")
+    gate_wires, gold_wires, net_of = parse_json(netlist, gate_file, gold_file)
 
     # Step 3: Find gate target
     print(f"[Step 3] Finding gate signal at {args.loc}...")
@@ -400,8 +873,7 @@ Examples:
 
     # Step 4: Filter gold candidates
     print(f"\n[Step 4] Collecting gold candidates (width={gate_target_width})...")
-    candidates = filter_gold_candidates(gold_wires)
-    candidates = [(w, wd, s, h) for w, wd, s, h in candidates if wd == gate_target_width]
+    candidates = filter_gold_candidates(gold_wires, target_width=gate_target_width)
 
     print(f"  Found {len(candidates)} candidates with matching width:")
     for wire_name, width, src, orig_name in candidates:
@@ -412,9 +884,34 @@ Examples:
         print("\n  No candidates with matching width found.")
         sys.exit(1)
 
-    # Step 5: Run proofs
-    print(f"\n[Step 5] Running formal proofs ({len(candidates)} candidates)...")
-    results = run_proofs(gold_file, gate_file, module_name, gate_target_wire, candidates, args.bounded)
+    # Step 5: Run proofs, reusing verdicts cached for this design, target and mode
+    verdicts_path = None if args.no_cache else _verdicts_path(rtlil_path)
+    cached = _load_verdicts(verdicts_path, gate_target_wire, args.bounded) if verdicts_path else {}
+    result_of = {cand[0]: (cand, cached[cand[0]]) for cand in candidates if cand[0] in cached}
+    pending = [cand for cand in candidates if cand[0] not in cached]
+    if args.first_match and any(passed for _, passed in result_of.values()):
+        pending = []
+
+    jobs = min(len(pending), args.jobs or os.cpu_count() or 1)
+    if pending:
+        print(f"\n[Step 5] Running formal proofs ({len(pending)} candidates, {jobs} jobs, "
+              f"{len(result_of)} cached)...")
+    elif len(result_of) < len(candidates):
+        print(f"\n[Step 5] Cached verdicts already include a match; skipping proofs "
+              f"({len(result_of)} cached, {len(candidates) - len(result_of)} not proved)")
+    else:
+        print(f"\n[Step 5] All {len(result_of)} verdicts loaded from cache")
+    proved, errors = run_proofs(gold_file, gate_file, module_name, gate_target_wire, pending,
+                                args.bounded, jobs=jobs, rtlil_path=rtlil_path,
+                                net_of=net_of, first_match=args.first_match, timeout=args.timeout)
+    result_of.update((cand[0], (cand, passed)) for cand, passed in proved)
+    results = [result_of[cand[0]] for cand in candidates if cand[0] in result_of]
+
+    # Timeouts are not verdicts, so they are retried on the next run
+    if verdicts_path:
+        verdicts = {cand[0]: passed for cand, passed in proved if passed is not None}
+        if verdicts:
+            _save_verdicts(verdicts_path, gate_target_wire, args.bounded, verdicts)
 
     # Step 6: Extract Chisel source and report
     equivalent = [(cand, passed) for cand, passed in results if passed]
@@ -431,26 +928,45 @@ Examples:
 
     if equivalent:
         print(f"\n  Equivalent signals in {gold_file}:\n")
-        print(f"  {'Signal':<25} {'Width':<6} {'Chisel Source'}")
-        print(f"  {'─' * 25} {'─' * 5} {'─' * 40}")
+        row_fmt = "  {:<25} {:<6} {}"
+        rows = [row_fmt.format('Signal', 'Width', 'Chisel Source'),
+                f"  {'─' * 25} {'─' * 5} {'─' * 40}"]
 
+        display_names = []
+        line_hints = {}
         for (wire_name, width, src, orig_name), _ in equivalent:
             display_name = orig_name or wire_name.replace('\\', '')
-            loc_info = get_source_location(display_name, gold_file)
+            display_names.append(display_name)
+            line_hints[display_name] = _src_line(src, gold_file)
+        locations = get_source_locations(display_names, gold_file, line_hints, module_name)
+
+        for display_name, ((wire_name, width, src, orig_name), _) in zip(display_names, equivalent):
+            loc_info = locations.get(display_name)
             if loc_info:
                 # Shorten path
                 loc_short = loc_info.split('/')[-1] if '/' in loc_info else loc_info
             else:
                 loc_short = "N/A"
-            print(f"  {display_name:<25} {width:<6} {loc_short}")
+            rows.append(row_fmt.format(display_name, width, loc_short))
+        print('\n'.join(rows))
     else:
         print("\n  No equivalent signals found.")
 
     # Summary
     total = len(results)
     passed = len(equivalent)
-    failed = total - passed
+    errored = sum(1 for cand, result in results if result is None and cand[0] in errors)
+    timed_out = sum(1 for cand, result in results if result is None and cand[0] not in errors)
+    failed = total - passed - timed_out - errored
     print(f"\n  Proved: {passed}/{total} equivalent, {failed} not equivalent")
+    if timed_out:
+        print(f"  Timed out: {timed_out} (no verdict within {args.timeout}s per candidate)")
+    if errored:
+        print(f"  Yosys errors: {errored} (no verdict)")
+        for message in dict.fromkeys(errors.values()):
+            print(f"    {message}")
+    if total < len(candidates):
+        print(f"  Stopped at first match; {len(candidates) - total} candidates not proved")
     print(f"{'=' * 70}")
 
 